@@ -1,10 +1,13 @@
+import os
+import sys
 import networkx as nx
-import random
-import string
 import matplotlib.pyplot as plt
-import pickle  # Use standard pickle instead of gpickle
-with open("random_power_graph_50.pkl", "rb") as f:
-    G_loaded = pickle.load(f)
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Fin"))
+from dispatch_pipeline import graph_from_grid, load_grid
+
+# Grid file from the generator (.npz) or a pickled graph
+G_loaded = graph_from_grid(load_grid("random_power_graph_50.npz"))
 
 sumpow = 0
 print("Node Data:")
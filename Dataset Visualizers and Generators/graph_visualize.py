@@ -1,13 +1,15 @@
+import os
+import sys
 import networkx as nx
 import matplotlib.pyplot as plt
-import pickle
 
-# Load the graph
-# with open("random_power_graph_50.pkl", "rb") as f:
-#    G = pickle.load(f)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Fin"))
+from dispatch_pipeline import graph_from_grid, load_grid
 
-with open("selected_power_graph_500.pkl", "rb") as f:
-   G = pickle.load(f)
+# Load the graph: a grid file from the generator (.npz) or a pickled graph
+# G = graph_from_grid(load_grid("random_power_graph_50.npz"))
+
+G = graph_from_grid(load_grid("selected_power_graph_500.pkl"))
 
 # Use a consistent layout
 pos = nx.spring_layout(G, seed=42)
@@ -1,20 +1,24 @@
-import networkx as nx
-import random
-import string
-import matplotlib.pyplot as plt
-import pickle  # Use standard pickle instead of gpickle
+import os
+import pickle
+import sys
+import numpy as np
 
-# Helper function to generate a random name
-def random_name(length=3):
-    return ''.join(random.choices(string.ascii_uppercase, k=length))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Fin"))
+from dispatch_pipeline import encode_sources, graph_from_grid, priority_sources, save_grid
+
+rng = np.random.default_rng()
+
+# Helper function to generate random names, packed as fixed-width bytes
+def random_names(count, length=3):
+    letters = rng.integers(ord('A'), ord('Z') + 1, size=(count, length), dtype=np.uint8)
+    return letters.view(f"S{length}").reshape(count)
 
 # Energy sources
 energy_sources = ["Solar", "Wind", "Coal", "Hydro"]
 
-# Create an empty graph
-G = nx.Graph()
-
 node_count = 10000
+filename = f"random_power_graph_{node_count}.npz"
+also_pickle = False  # also write the networkx pickle, for tools that still unpickle the graph
 # Mapping from energy source to clean score
 clean_score_map = {
     "Solar": 0,
@@ -23,34 +27,39 @@ clean_score_map = {
     "Coal": 3
 }
 
-# Step 1: Add 50 nodes with attributes
-for i in range(node_count):
-    energy_source = random.choice(energy_sources)
-    clean_score = clean_score_map[energy_source]  # Assign based on energy source
-    
-    G.add_node(
-        i,
-        name=random_name(),
-        energy_source=energy_source,
-        clean_score=clean_score,
-        power_output=random.randint(10, 250)
-    )
+# Step 1: Node attributes as columns: uint8 source codes plus a lookup table in the saved file
+sources = rng.choice(energy_sources, size=node_count)
+codes = encode_sources(sources)
+clean_by_code = np.array([clean_score_map[s] for s in priority_sources], dtype=np.uint8)
+
+grid = {
+    "nodes": np.arange(node_count, dtype=np.int32),
+    "names": random_names(node_count),
+    "source": codes,
+    "clean": clean_by_code[codes],  # Assign based on energy source
+    "power": rng.integers(10, 251, size=node_count, dtype=np.int32),
+    "available": np.ones(node_count, dtype=bool),
+}
 
 
 # Step 2: Add random edges with weights (0 to 100)
 edge_prob = 0.1  # 10% chance for any pair to be connected
+us, vs = [], []
 for i in range(node_count):
-    for j in range(i + 1, node_count):
-        if random.random() < edge_prob:
-            weight = random.randint(0, 100)
-            G.add_edge(i, j, weight=weight)
+    js = i + 1 + np.flatnonzero(rng.random(node_count - i - 1) < edge_prob)
+    us.append(np.full(len(js), i, dtype=np.int32))
+    vs.append(js.astype(np.int32))
+grid["u"] = np.concatenate(us)
+grid["v"] = np.concatenate(vs)
+grid["w"] = rng.integers(0, 101, size=len(grid["u"]), dtype=np.uint8)
 
 # Step 3: Print graph summary
 print("Generated graph with:")
-print(f"- {G.number_of_nodes()} nodes")
-print(f"- {G.number_of_edges()} edges")
-
-# Step 4: Save the graph using pickle
-with open("random_power_graph_10000.pkl", "wb") as f:
-    pickle.dump(G, f)
+print(f"- {node_count} nodes")
+print(f"- {len(grid['u'])} edges")
 
+# Step 4: Save the grid columns
+save_grid(grid, filename)
+if also_pickle:
+    with open(filename.replace(".npz", ".pkl"), "wb") as f:
+        pickle.dump(graph_from_grid(grid), f)
@@ -1,15 +1,15 @@
-import pulp
-import networkx as nx
-import pickle
+import os
+import re
+import sys
 import time
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Fin"))
+from dispatch_pipeline import load_grid, run_dispatch, select_lp
+
 target_power = 8000
 
 # Load the graph
-with open("random_power_graph_100.pkl", "rb") as f:
-    G = pickle.load(f)
-
-    import re
+G = load_grid("random_power_graph_100.pkl")
 
 def estimate_cbc_operations(log_text, op_per_iter=100, op_per_node=2000):
     """
@@ -40,88 +40,22 @@ def estimate_cbc_operations(log_text, op_per_iter=100, op_per_node=2000):
 
 
 
-def lp_node_selection(graph, target_power, alpha=10, beta=1, gamma=0.01):
-    operation_count = 0  # Initialize op count
-
-    prob = pulp.LpProblem("CleanPowerSelection", pulp.LpMinimize)
-
-    # Decision variables
-    node_vars = {i: pulp.LpVariable(f"x_{i}", cat='Binary') for i in graph.nodes()}
-    operation_count += len(node_vars)
-
-    # Objective components
-    clean_penalty = pulp.lpSum(node_vars[i] * graph.nodes[i]['clean_score'] for i in graph.nodes())
-    operation_count += len(graph.nodes())
-
-    node_count_penalty = pulp.lpSum(node_vars[i] for i in graph.nodes())
-    operation_count += len(graph.nodes())
-
-    edge_penalty = pulp.lpSum(
-        node_vars[i] * sum(d['weight'] for _, _, d in graph.edges(i, data=True))
-        for i in graph.nodes()
-    )
-    operation_count += sum(len(list(graph.edges(i))) for i in graph.nodes())
-
-    # Full objective
-    prob += alpha * clean_penalty + beta * node_count_penalty + gamma * edge_penalty
-    operation_count += 1
-
-    # Power constraint
-    total_power_expr = pulp.lpSum(node_vars[i] * graph.nodes[i]['power_output'] for i in graph.nodes())
-    prob += total_power_expr >= target_power, "PowerDemand"
-    operation_count += len(graph.nodes())
+def lp_node_selection(grid, target_power, alpha=10, beta=1, gamma=0.01):
+    solve_time = {}
 
     # Solve LP with logging and timing
-    start = time.time()
-    prob.solve(pulp.PULP_CBC_CMD(msg=1))  # <- Solver output enabled
-    end = time.time()
-
-    if pulp.LpStatus[prob.status] != "Optimal":
-        print(" No optimal solution found.")
-        return None
-
-    # Collect selected nodes
-    selected_nodes = [i for i in graph.nodes() if pulp.value(node_vars[i]) == 1]
-    operation_count += len(graph.nodes())
-
-    total_power = sum(graph.nodes[i]['power_output'] for i in selected_nodes)
-    operation_count += len(selected_nodes)
-
-    # Build MST over selected subgraph
-    subgraph = graph.subgraph(selected_nodes)
-    mst = nx.minimum_spanning_tree(subgraph, algorithm="kruskal", weight="weight")
-    total_cost = sum(d['weight'] for u, v, d in mst.edges(data=True))
-    operation_count += len(mst.edges()) * 2
-
-    # Energy breakdown
-    breakdown = {"Solar": 0, "Wind": 0, "Hydro": 0, "Coal": 0}
-    for i in selected_nodes:
-        breakdown[graph.nodes[i]['energy_source']] += 1
-        operation_count += 1
-
-    # Display MST edges
-    print("\n MST Edges (LP):")
-    for u, v, d in mst.edges(data=True):
-        name_u = graph.nodes[u]['name']
-        name_v = graph.nodes[v]['name']
-        #print(f"{name_u} - {name_v} (cost: {d['weight']:.2f})")
-        operation_count += 1
-
-    print(f"\n Total MST Cost: {total_cost:.2f}")
-    print(f" Total Operation Count (Python-side): {operation_count}")
-    print(f" LP Variables: {len(prob.variables())}")
-    print(f" LP Constraints: {len(prob.constraints)}")
-    print(f" LP Solver Runtime: {round(end - start, 4)} seconds")
-
-    return {
-        "Method": "LP Optimization",
-        "Total Cost": total_cost,
-        "Total Power": total_power,
-        "Energy Breakdown": breakdown,
-        "Selected Nodes": selected_nodes,
-        "MST": mst,
-        "OpCount": operation_count
-    }
+    def timed_lp(grid, target_power):
+        start = time.time()
+        selection = select_lp(grid, target_power, alpha, beta, gamma, msg=True)  # <- Solver output enabled
+        solve_time["seconds"] = time.time() - start
+        return selection
+
+    result = run_dispatch(grid, timed_lp, target_power, method="LP", show_edges=False, accounting="lp")
+    if result:
+        print(f" LP Variables: {int(grid['available'].sum())}")  # one per available station, as select_lp builds them
+        print(" LP Constraints: 1")
+        print(f" LP Solver Runtime: {round(solve_time['seconds'], 4)} seconds")
+    return result
 
 # Run LP optimization and display results
 lp_results = lp_node_selection(G, target_power, alpha=10, beta=1, gamma=0.01)
@@ -1,66 +1,18 @@
-import pulp
-import networkx as nx
-import pickle
+import os
+import sys
+from functools import partial
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Fin"))
+from dispatch_pipeline import load_grid, run_dispatch, select_lp
 
 # Load the graph
-with open("random_power_graph_50good.pkl", "rb") as f:
-    G = pickle.load(f)
-import pulp
-
-def lp_node_selection(graph, target_power, alpha=10, beta=1, gamma=0.01):
-    prob = pulp.LpProblem("CleanPowerSelection", pulp.LpMinimize)
-
-    # Decision variables for each node
-    node_vars = {i: pulp.LpVariable(f"x_{i}", cat='Binary') for i in graph.nodes()}
-
-    # A. Clean score penalty (low = clean)
-    clean_penalty = pulp.lpSum(node_vars[i] * graph.nodes[i]['clean_score'] for i in graph.nodes())
-
-    # B. Node count penalty (minimize number of selected nodes)
-    node_count_penalty = pulp.lpSum(node_vars[i] for i in graph.nodes())
-
-    # C. Edge weight approximation penalty (sum of adjacent edge weights for selected nodes)
-    edge_penalty = pulp.lpSum(
-        node_vars[i] * sum(d['weight'] for _, _, d in graph.edges(i, data=True))
-        for i in graph.nodes()
-    )
-
-    # Full weighted objective
-    prob += alpha * clean_penalty + beta * node_count_penalty + gamma * edge_penalty, "MultiObjective"
-
-    # Constraint: Total power output must meet demand
-    power_expr = pulp.lpSum(node_vars[i] * graph.nodes[i]['power_output'] for i in graph.nodes())
-    prob += power_expr >= target_power, "PowerDemandConstraint"
-
-    # Solve
-    prob.solve(pulp.PULP_CBC_CMD(msg=0))
-
-    if pulp.LpStatus[prob.status] != "Optimal":
-        print("❌ No optimal solution found.")
-        return None
-
-    # Gather selected nodes
-    selected_nodes = [i for i in graph.nodes() if pulp.value(node_vars[i]) == 1]
-    total_power = sum(graph.nodes[i]['power_output'] for i in selected_nodes)
-
-    # Build MST on selected subgraph
-    subgraph = graph.subgraph(selected_nodes)
-    mst = nx.minimum_spanning_tree(subgraph, algorithm="kruskal", weight="weight")
-    total_cost = sum(d['weight'] for u, v, d in mst.edges(data=True))
-
-    # Clean energy breakdown
-    breakdown = {"Solar": 0, "Wind": 0, "Hydro": 0, "Coal": 0}
-    for i in selected_nodes:
-        breakdown[graph.nodes[i]['energy_source']] += 1
-
-    return {
-        "Method": "LP Optimization",
-        "Total Cost": total_cost,
-        "Total Power": total_power,
-        "Energy Breakdown": breakdown,
-        "Selected Nodes": selected_nodes,
-        "MST": mst
-    }
+G = load_grid("random_power_graph_50good.pkl")
+
+
+# Weighted clean / node count / edge weight objective, subject to meeting the target power
+def lp_node_selection(grid, target_power, alpha=10, beta=1, gamma=0.01):
+    selector = partial(select_lp, alpha=alpha, beta=beta, gamma=gamma)
+    return run_dispatch(grid, selector, target_power, method="LP Optimization", show_edges=False, report=False)
 
 result1 = lp_node_selection(G, target_power=5000, alpha=10, beta=1, gamma=0.01)
 result2 = lp_node_selection(G, target_power=5000, alpha=100, beta=1, gamma=0.01)
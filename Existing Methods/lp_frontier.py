@@ -0,0 +1,222 @@
+import csv
+import os
+import sys
+import time
+import numpy as np
+from itertools import combinations
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Fin"))
+from dispatch_pipeline import build_mst, load_grid, node_ids
+
+target_power = 5000
+
+
+# Per-station objective terms, each scaled to [0, 1] so the weights are comparable:
+# clean score, 1 for the station count, and incident edge weight. Also returns the divisor of
+# each term, to map weights back to the scale select_lp / lp_node_selection use.
+def objective_terms(grid):
+    node_count = len(grid["power"])
+    edge_sum = np.bincount(grid["u"], grid["w"], node_count) + np.bincount(grid["v"], grid["w"], node_count)
+    scales = np.array([max(int(grid["clean"].max()), 1), 1.0, max(edge_sum.max(), 1.0)])
+    return np.column_stack([grid["clean"] / scales[0], np.ones(node_count), edge_sum / scales[2]]), scales
+
+
+# Lower bound for one weighting from the LP relaxation: with a single power constraint it is
+# solved exactly by taking stations in order of cost per unit of power
+def relaxation_bound(cost, power, target_power):
+    order = np.argsort(cost / power, kind="stable")
+    reached = np.cumsum(power[order])
+    k = int(np.searchsorted(reached, target_power))
+    if k == len(order):
+        return np.inf
+    before = reached[k - 1] if k else 0
+    return cost[order[:k]].sum() + cost[order[k]] * (target_power - before) / power[order[k]]
+
+
+# Model data each worker process receives once, from the pool initializer: the available
+# stations, their objective terms and power, and the target
+_model = {}
+
+
+def _init_worker(candidates, terms, power, target_power):
+    _model.update(candidates=candidates, terms=terms, power=power, target_power=target_power)
+
+
+# One worker task: builds the model once and walks its weightings in order. A weighting is answered
+# from an earlier selection only when that selection reaches the relaxation bound (so it is
+# optimal), or is within `gap` of it when solving approximately; otherwise CBC re-solves with
+# only the objective swapped, warm-started from the best earlier selection.
+def solve_weights(task):
+    import pulp
+
+    points, gap = task
+    candidates, terms, power, target_power = (_model[k] for k in ("candidates", "terms", "power", "target_power"))
+
+    prob = pulp.LpProblem("CleanPowerFrontier", pulp.LpMinimize)
+    x = [pulp.LpVariable(f"x_{i}", cat='Binary') for i in candidates]
+    prob += pulp.LpAffineExpression(zip(x, power.tolist())) >= target_power, "PowerDemand"
+
+    incumbents = []  # 0/1 rows over candidates
+    solutions = []
+    for point in points:
+        cost = terms @ np.asarray(point)
+        bound = relaxation_bound(cost, power, target_power)
+        if bound == np.inf:
+            solutions.append((point, None, False))
+            continue
+
+        if incumbents:
+            values = np.array(incumbents) @ cost
+            best = int(values.argmin())
+            if values[best] <= bound + gap * abs(bound) + 1e-9:
+                solutions.append((point, tuple(candidates[incumbents[best] == 1].tolist()), False))
+                continue
+            for var, on in zip(x, incumbents[best]):
+                var.setInitialValue(int(on))
+
+        prob.setObjective(pulp.LpAffineExpression(zip(x, cost.tolist())))
+        prob.solve(pulp.PULP_CBC_CMD(msg=0, warmStart=bool(incumbents), gapRel=gap))
+        if pulp.LpStatus[prob.status] != "Optimal":
+            solutions.append((point, None, True))
+            continue
+        chosen = np.array([round(var.value()) for var in x], dtype=np.int8)
+        incumbents.append(chosen)
+        solutions.append((point, tuple(candidates[chosen == 1].tolist()), True))
+    return solutions
+
+
+# Vertices of the lower envelope of the known selections over the weight simplex: its corners,
+# points on its edges where two selections tie at the minimum, and inside points where three do.
+# A new selection's excess over the envelope is a maximum of linear functions, so if none beats
+# the envelope at these vertices, none beats it anywhere and the known selections are all the
+# optima there are.
+def envelope_vertices(vectors):
+    vectors = np.array(vectors)
+    count = len(vectors)
+    candidates, ties = [np.eye(3)], [np.ones(3)]
+
+    i, j = np.triu_indices(count, 1)
+    d = vectors[i] - vectors[j]
+    for p, q in ((0, 1), (1, 2), (2, 0)):
+        dp, dq = d[:, p], d[:, q]
+        crossing = dp * dq < 0
+        t = dp[crossing] / (dp[crossing] - dq[crossing])
+        points = np.zeros((len(t), 3))
+        points[:, p], points[:, q] = 1 - t, t
+        candidates.append(points)
+        ties.append(np.full(len(t), 2))
+
+    if count >= 3:
+        i, j, k = np.array([c for c in combinations(range(count), 3)]).T
+        systems = np.stack([vectors[i] - vectors[j], vectors[i] - vectors[k], np.ones((len(i), 3))], axis=1)
+        solvable = np.abs(np.linalg.det(systems)) > 1e-12
+        points = np.linalg.solve(systems[solvable], np.tile([0.0, 0.0, 1.0], (int(solvable.sum()), 1))[..., None])[..., 0]
+        points = points[np.all(points > 1e-12, axis=1)]
+        candidates.append(points)
+        ties.append(np.full(len(points), 3))
+
+    candidates, ties = np.concatenate(candidates), np.concatenate(ties)
+    values = candidates @ vectors.T
+    at_minimum = (values <= values.min(axis=1, keepdims=True) + 1e-9).sum(axis=1)
+    keep = candidates[at_minimum >= ties]
+    return sorted({tuple(np.round(point / point.sum(), 12)) for point in keep})
+
+
+# Selections not dominated on (clean score, MST cost, station count); all three are minimized
+def non_dominated(rows):
+    keys = np.array([(r["Clean Score"], r["Total Cost"], r["Stations"]) for r in rows])
+    keep = []
+    for i, k in enumerate(keys):
+        dominated = np.any(np.all(keys <= k, axis=1) & np.any(keys < k, axis=1))
+        if not dominated:
+            keep.append(rows[i])
+    return keep
+
+
+# Tradeoff explorer for the LP selection. The LP scalarizes clean score, station count and the
+# incident-edge-weight proxy for transmission cost; this finds every selection that is optimal
+# for some weighting of those three (the supported points of the proxy problem), then builds
+# their MSTs and keeps those not dominated on (clean score, MST cost, station count). It is not
+# the Pareto frontier over MST cost itself: MST cost is not in the LP, and selections that no
+# weighted sum reaches are never found.
+# The weight simplex is decomposed exactly: each round solves the not yet probed vertices of the
+# lower envelope of the selections found so far (envelope_vertices), and it stops once every
+# vertex has been probed without finding a better selection, so no weighting is missed. Solves
+# grow with the number of distinct optimal selections rather than with a weight grid.
+# With gap > 0 each weighting is only solved to within `gap` of its optimum and the output is
+# marked approximate. Weights are reported on select_lp's scale (alpha per clean score point,
+# beta per station, gamma per unit of incident edge weight); any positive multiple of them
+# gives the same selection.
+def pareto_frontier(grid, target_power, gap=0.0, workers=None, weight_uplift=0.0, filename=None):
+    start = time.time()
+    workers = workers or os.cpu_count()
+    solutions, vectors = {}, {}
+    cbc_solves = 0
+    terms, scales = objective_terms(grid)
+
+    # Workers get the candidate data once instead of the whole grid with every task
+    candidates = np.flatnonzero(grid["available"])
+    model = (candidates, terms[candidates], grid["power"][candidates].astype(float), target_power)
+
+    pending = envelope_vertices(np.eye(3))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=model) as pool:
+        while pending:
+            # Neighbouring points go to the same worker so warm starts stay close
+            chunks = [c for c in np.array_split(np.arange(len(pending)), workers) if len(c)]
+            tasks = [([pending[i] for i in c], gap) for c in chunks]
+            for chunk in pool.map(solve_weights, tasks):
+                for point, picked, solved in chunk:
+                    solutions[point] = picked
+                    cbc_solves += solved
+                    if picked is not None:
+                        vector = terms[np.array(picked, dtype=np.int64)].sum(axis=0)
+                        vectors.setdefault(tuple(np.round(vector, 9)), vector)
+            if not vectors:
+                break  # target not reachable
+            pending = [p for p in envelope_vertices(list(vectors.values())) if p not in solutions]
+    answered = [(point, picked) for point, picked in solutions.items() if picked is not None]
+
+    # Many weightings land on the same selection; its MST is only built once
+    distinct = {}
+    for w, picked in answered:
+        distinct.setdefault(picked, []).append(w)
+
+    rows = []
+    for picked, ws in distinct.items():
+        selected = np.array(picked, dtype=np.int64)
+        su, sv, sw, tree = build_mst(grid, selected, weight_uplift)
+        rows.append({
+            "Clean Score": int(grid["clean"][selected].sum()),
+            "Total Cost": float(sw[tree].sum()),
+            "Stations": len(selected),
+            "Total Power": int(grid["power"][selected].sum()),
+            "Weights": tuple((np.array(ws[0]) / scales).tolist()),
+            "Selected Nodes": node_ids(grid, selected),
+        })
+    frontier = sorted(non_dominated(rows), key=lambda r: (r["Clean Score"], r["Total Cost"], r["Stations"]))
+    elapsed = time.time() - start
+
+    label = f"solves within {gap:.1%} of optimal" if gap else "exact solves"
+    print(f"\nSupported LP selections filtered by MST cost ({label}; {len(frontier)} non-dominated of "
+          f"{len(rows)} distinct selections, {len(solutions)} weightings probed, {cbc_solves} CBC solves, "
+          f"{elapsed:.2f} s):")
+    print(f"{'Clean':>6} {'MST Cost':>10} {'Stations':>9} {'Power':>7}   (alpha, beta, gamma) on select_lp's scale")
+    for r in frontier:
+        a, b, g = r["Weights"]
+        print(f"{r['Clean Score']:>6} {r['Total Cost']:>10.2f} {r['Stations']:>9} {r['Total Power']:>7}   ({a:.3g}, {b:.3g}, {g:.3g})")
+
+    if filename:
+        with open(filename, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["clean_score", "mst_cost", "stations", "total_power", "alpha", "beta", "gamma"])
+            for r in frontier:
+                writer.writerow([r["Clean Score"], r["Total Cost"], r["Stations"], r["Total Power"], *r["Weights"]])
+        print(f"\nFrontier saved to '{filename}'.")
+    return frontier
+
+
+if __name__ == "__main__":
+    # Load the graph
+    G = load_grid("random_power_graph_50good.pkl")
+    pareto_frontier(G, target_power, filename="pareto_frontier_50.csv")
@@ -0,0 +1,347 @@
+import os
+import pickle
+import time
+import numpy as np
+import networkx as nx
+
+from boruvka_mst import boruvka_mst, graph_edge_arrays
+from telemetry_log import apply_log
+
+# Priority source order (cleanest to dirtiest); also the energy breakdown order.
+# A station's energy_source is stored as its uint8 position in this table.
+priority_sources = ["Solar", "Wind", "Hydro", "Coal"]
+source_table = np.array(priority_sources)
+
+
+# Energy source strings -> uint8 codes, hashing each distinct string only once
+def encode_sources(sources):
+    distinct, inverse = np.unique(np.asarray(sources), return_inverse=True)
+    codes = np.array([priority_sources.index(s) for s in distinct.tolist()], dtype=np.uint8)
+    return codes[inverse.reshape(-1)]
+
+
+# Station name as text; names are kept packed in a fixed-width byte array
+def station_name(grid, i):
+    return grid["names"][i].decode()
+
+
+# Original node ids for grid positions; integer ids are kept as an int32 column
+def node_ids(grid, selected):
+    nodes = grid["nodes"]
+    if isinstance(nodes, np.ndarray):
+        return nodes[selected].tolist()
+    return [nodes[i] for i in np.asarray(selected).tolist()]
+
+
+# Flatten a power graph once into column arrays shared by every stage of the pipeline.
+# Per station this is a fixed-width name, a uint8 source code and clean score, an int32 output
+# and an availability flag, instead of a dict of Python objects.
+def grid_from_graph(graph):
+    nodes, u, v, w = graph_edge_arrays(graph)
+    attrs = [graph.nodes[n] for n in nodes]
+    grid = {
+        "nodes": np.array(nodes, dtype=np.int32) if all(isinstance(n, int) for n in nodes) else nodes,
+        "names": np.array([a['name'].encode() for a in attrs]),
+        "power": np.array([a['power_output'] for a in attrs], dtype=np.int32),
+        "clean": np.array([a['clean_score'] for a in attrs], dtype=np.uint8),
+        "available": np.array([a.get('available', True) for a in attrs], dtype=bool),
+        "source": encode_sources([a['energy_source'] for a in attrs]),
+        "u": u,
+        "v": v,
+        "w": w,
+    }
+    # Region labels, when every station has one, become small integer codes
+    if all('region' in a for a in attrs):
+        grid["region"] = np.unique([a['region'] for a in attrs], return_inverse=True)[1].astype(np.int32)
+    return grid
+
+
+# Columns written to and read from a grid file
+grid_columns = ["nodes", "names", "power", "clean", "available", "source", "u", "v", "w"]
+optional_columns = ["region"]
+
+
+# Save grid columns as one .npz; written to a temporary file first, then swapped in
+def save_grid(grid, filename):
+    with open(filename + ".tmp", "wb") as f:
+        np.savez(f, source_table=source_table, **{c: grid[c] for c in grid_columns + optional_columns if c in grid})
+    os.replace(filename + ".tmp", filename)
+
+
+# Rebuild a networkx graph (optionally only the selected stations) for pickle-based tools
+def graph_from_grid(grid, selected=None):
+    selected = np.arange(len(grid["power"])) if selected is None else np.asarray(selected)
+    nodes = node_ids(grid, selected)
+    graph = nx.Graph()
+    for node, i in zip(nodes, selected.tolist()):
+        graph.add_node(node,
+                       name=station_name(grid, i),
+                       energy_source=priority_sources[grid["source"][i]],
+                       clean_score=int(grid["clean"][i]),
+                       power_output=int(grid["power"][i]),
+                       available=bool(grid["available"][i]))
+    su, sv, sw = induce(grid, selected)
+    graph.add_weighted_edges_from((nodes[a], nodes[b], c) for a, b, c in zip(su.tolist(), sv.tolist(), sw.tolist()))
+    return graph
+
+
+# Load a grid file (.npz from the generator) or a pickled power graph into grid arrays.
+# With sparse_keep, the sparsified MST edges are built once and cached next to the grid file.
+def load_grid(filename, sparse_keep=None):
+    if filename.endswith(".npz"):
+        with np.load(filename) as data:
+            grid = {c: data[c] for c in grid_columns + optional_columns if c in data.files}
+            # Codes are positions in the table the file was written with
+            remap = encode_sources(data["source_table"].tolist())
+            grid["source"] = remap[grid["source"]]
+    else:
+        with open(filename, "rb") as f:
+            graph = pickle.load(f)
+        grid = grid_from_graph(graph)
+    if sparse_keep:
+        cache = f"{os.path.splitext(filename)[0]}_sparse{sparse_keep}.npz"
+        if os.path.exists(cache) and os.path.getmtime(cache) >= os.path.getmtime(filename):
+            with np.load(cache) as data:
+                grid["sparse"] = (data["u"], data["v"], data["w"])
+        else:
+            add_sparse_edges(grid, sparse_keep)
+            su, sv, sw = grid["sparse"]
+            with open(cache + ".tmp", "wb") as f:
+                np.savez(f, u=su, v=sv, w=sw)
+            os.replace(cache + ".tmp", cache)
+    return grid
+
+
+# Keep, per node, only its `keep` lightest incident edges, plus the full-graph MST so the
+# sparse graph as a whole stays as connected as the original. Induced subgraphs are not: a
+# selection's sparse edges can miss the links that join it, so build_mst only tries
+# grid["sparse"] for selections large enough to be expected to span (see sparse_can_span)
+# and falls back to the exact edges otherwise. Selectors keep using the full edge arrays.
+def add_sparse_edges(grid, keep=8):
+    u, v, w = grid["u"], grid["v"], grid["w"]
+    node_count, edge_count = len(grid["power"]), len(u)
+
+    # Both directions of every edge, grouped by CSR row and sorted by weight inside each row
+    src = np.concatenate([u, v])
+    edge = np.concatenate([np.arange(edge_count), np.arange(edge_count)])
+    order = np.lexsort((np.concatenate([w, w]), src))
+    row_start = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=node_count), out=row_start[1:])
+    rank_in_row = np.arange(len(order)) - row_start[src[order]]
+
+    kept = np.zeros(edge_count, dtype=bool)
+    kept[edge[order[rank_in_row < keep]]] = True
+    kept[boruvka_mst(node_count, u, v, w)] = True
+    grid["sparse"] = (u[kept], v[kept], w[kept])
+    return grid
+
+
+# Shortest prefix of the available stations in `order` whose power meets the target
+# (all of them if it never does)
+def take_until(grid, order, target_power):
+    order = order[grid["available"][order]]
+    reached = np.searchsorted(np.cumsum(grid["power"][order]), target_power) + 1
+    return order[:min(reached, len(order))]
+
+
+def sort_ops(n):
+    return n * int(n).bit_length()  # rough estimate for sorting
+
+
+# --- Selectors: (grid, target_power) -> (selected node indices, operation count) ---
+
+# Highest power output first (standard Kruskal-based selection and greedy load dispatch)
+def select_by_power(grid, target_power):
+    order = np.argsort(-grid["power"], kind="stable")
+    selected = take_until(grid, order, target_power)
+    return selected, sort_ops(len(order)) + len(selected)
+
+
+# Cleanest source first, then (clean_score, -power_output, node) as in the mstStack priority queues
+def select_clean_priority(grid, target_power):
+    nodes = np.arange(len(grid["power"]))
+    order = np.lexsort((nodes, -grid["power"], grid["clean"], grid["source"]))
+    selected = take_until(grid, order, target_power)
+    return selected, len(order) + len(selected)
+
+
+# Ascending alpha * normalized clean score + beta * normalized incident edge weight
+def select_heuristic(grid, target_power, alpha=1.0, beta=1.0):
+    node_count = len(grid["power"])
+    edge_sum = np.bincount(grid["u"], grid["w"], node_count) + np.bincount(grid["v"], grid["w"], node_count)
+    max_clean, max_edge = grid["clean"].max(), edge_sum.max()
+    clean_score = grid["clean"] / max_clean if max_clean else np.zeros(node_count)
+    edge_score = edge_sum / max_edge if max_edge else np.zeros(node_count)
+
+    order = np.argsort(alpha * clean_score + beta * edge_score, kind="stable")
+    selected = take_until(grid, order, target_power)
+    ops = node_count * 3 + 2 * len(grid["u"]) + sort_ops(node_count) + len(selected)
+    return selected, ops
+
+
+# Binary program: minimize alpha * clean + beta * node count + gamma * incident edge weight
+# subject to meeting the target power. Needs pulp.
+def select_lp(grid, target_power, alpha=10, beta=1, gamma=0.01, msg=False):
+    import pulp
+
+    node_count = len(grid["power"])
+    edge_sum = np.bincount(grid["u"], grid["w"], node_count) + np.bincount(grid["v"], grid["w"], node_count)
+    # Weighted in float: the clean column is uint8 and would wrap for large alpha
+    cost = alpha * grid["clean"].astype(np.float64) + beta + gamma * edge_sum
+
+    # Only stations that are currently available get a decision variable
+    candidates = np.flatnonzero(grid["available"])
+    prob = pulp.LpProblem("CleanPowerSelection", pulp.LpMinimize)
+    x = [pulp.LpVariable(f"x_{i}", cat='Binary') for i in candidates]
+    prob += pulp.LpAffineExpression(zip(x, cost[candidates].tolist())), "MultiObjective"
+    prob += pulp.LpAffineExpression(zip(x, grid["power"][candidates].tolist())) >= target_power, "PowerDemand"
+    prob.solve(pulp.PULP_CBC_CMD(msg=msg))
+
+    # Variables, three objective terms (the edge term once per incident edge), objective
+    # assembly, power constraint, then one value check per variable
+    ops = node_count * 5 + 2 * len(grid["u"]) + 1
+    if pulp.LpStatus[prob.status] != "Optimal":
+        print(" No optimal solution found.")
+        return None, ops
+    selected = candidates[[round(var.value()) == 1 for var in x]]
+    return selected, ops + len(selected)  # + total power
+
+
+# --- Shared stages ---
+
+# Operation counts after selection, tallied the way each method always has so OpCount stays
+# comparable with the published results: (selected, induced edges, tree edges) -> count.
+# Every method counts two per tree edge (edge processing + cost summation), one per selected
+# node for the breakdown and one per tree edge for the edge listing.
+stage_ops = {
+    # subgraph copy, plus the 2% uplift applied to every induced edge, plus the selection display
+    "mstStack": lambda n, edges, tree: (n + edges) + edges + 2 * tree + n + n + tree,
+    # subgraph overhead (nodes and edges)
+    "greedy": lambda n, edges, tree: (n + edges) + 2 * tree + n + tree,
+    # subgraph nodes only
+    "heuristic": lambda n, edges, tree: n + 2 * tree + n + tree,
+    # no subgraph overhead
+    "lp": lambda n, edges, tree: 2 * tree + n + tree,
+}
+
+# Whether the sparse edges can be expected to connect a selection of `count` stations. The
+# selection keeps each sparse edge with probability about (count / node_count)^2; below an
+# average of four induced edges per station the sparse tree practically never spans. Typical
+# dispatches (tens of stations out of thousands) are far below this and go straight to the
+# exact edges, so sparsification only pays off for selections covering much of the grid.
+def sparse_can_span(grid, count):
+    node_count = len(grid["power"])
+    expected = len(grid["sparse"][0]) * count * (count - 1) / (node_count * max(node_count - 1, 1))
+    return count > 1 and expected >= 2 * count
+
+
+# Edges of the subgraph induced by the selected nodes, renumbered to selection positions
+def induce(grid, selected, edges=None):
+    u, v, w = edges if edges is not None else (grid["u"], grid["v"], grid["w"])
+    local = np.full(len(grid["power"]), -1)
+    local[selected] = np.arange(len(selected))
+    inside = (local[u] >= 0) & (local[v] >= 0)
+    return local[u[inside]], local[v[inside]], w[inside]
+
+
+# Edges of the induced subgraph and their MST. Uses the sparsified edges when the grid has them
+# and the selection is large enough for them to span (unless exact is set) and, with fallback,
+# redoes the tree on the exact edges whenever the sparse tree still does not span the selection.
+def build_mst(grid, selected, weight_uplift=0.0, workers=1, exact=False, fallback=True):
+    sparse = not exact and "sparse" in grid and (not fallback or sparse_can_span(grid, len(selected)))
+    su, sv, sw = induce(grid, selected, grid["sparse"] if sparse else None)
+    sw = sw * (1.0 + weight_uplift)  # float even for uint8 weights
+    tree = boruvka_mst(len(selected), su, sv, sw, workers)
+    if sparse and fallback and len(tree) < len(selected) - 1:
+        return build_mst(grid, selected, weight_uplift, workers, exact=True)
+    return su, sv, sw, tree
+
+
+# Run selector -> induce -> MST -> breakdown -> report; returns None when the target is not met
+def run_dispatch(grid, selector, target_power, method="", weight_uplift=0.0, workers=1,
+                 show_edges=True, report=True, exact=False, accounting="greedy"):
+    # Live station updates are folded into the grid columns just before each dispatch
+    if "telemetry" in grid:
+        apply_log(grid)
+
+    selected, operation_count = selector(grid, target_power)
+    if selected is None:
+        return None
+
+    total_power = int(grid["power"][selected].sum())
+    if total_power < target_power:
+        print(" Warning: Could not meet target power with available nodes.")
+        return None
+
+    su, sv, sw, tree = build_mst(grid, selected, weight_uplift, workers, exact)
+    total_cost = float(sw[tree].sum())
+    operation_count += stage_ops[accounting](len(selected), len(sw), len(tree))
+
+    counts = np.bincount(grid["source"][selected], minlength=len(priority_sources))
+    breakdown = dict(zip(priority_sources, counts.tolist()))
+
+    nodes = node_ids(grid, selected)
+    mst = nx.Graph()
+    mst.add_nodes_from(nodes)
+    mst.add_weighted_edges_from((nodes[a], nodes[b], c)
+                                for a, b, c in zip(su[tree].tolist(), sv[tree].tolist(), sw[tree].tolist()))
+
+    if show_edges:
+        print(f"\nMST Edges{f' ({method})' if method else ''}:")
+        for a, b, c in zip(su[tree], sv[tree], sw[tree]):
+            print(f"{station_name(grid, selected[a])} - {station_name(grid, selected[b])} (cost: {c:.2f})")
+    if report:
+        print(f"\nTotal MST Cost: {total_cost:.2f}")
+        print(f"Total Operation Count: {operation_count}")
+
+    return {
+        "Method": method,
+        "Selected Nodes": nodes,
+        "Total Power": total_power,
+        "Total Cost": total_cost,
+        "Energy Breakdown": breakdown,
+        "MST": mst,
+        "OpCount": operation_count
+    }
+
+
+# MST cost and build time on the sparsified edges (without fallback) against the exact edges,
+# for one selection, plus the edges and cost dispatch actually ends up using
+def sparsification_report(grid, selector, target_power, weight_uplift=0.0):
+    selected, _ = selector(grid, target_power)
+    rows = {}
+    for label, exact in (("exact", True), ("sparse", False)):
+        start = time.time()
+        su, sv, sw, tree = build_mst(grid, selected, weight_uplift, exact=exact, fallback=False)
+        rows[label] = (float(sw[tree].sum()), time.time() - start, len(sw), len(tree))
+    start = time.time()
+    su, sv, sw, tree = build_mst(grid, selected, weight_uplift)
+    dispatch_cost, dispatch_time = float(sw[tree].sum()), time.time() - start
+
+    print(f"Edges kept: {len(grid['sparse'][0])} of {len(grid['u'])}, {len(selected)} stations selected")
+    for label, (cost, elapsed, induced, tree_edges) in rows.items():
+        print(f"{label:>6} MST: cost {cost:.2f}, {tree_edges} tree edges from {induced} induced edges, {elapsed:.4f} s")
+
+    exact_cost, exact_time, _, exact_tree = rows["exact"]
+    sparse_cost, sparse_time, _, sparse_tree = rows["sparse"]
+    spanning = sparse_tree == exact_tree
+    # A sparse forest that does not span has fewer edges, so its cost is not comparable
+    diff = sparse_cost - exact_cost if spanning else None
+    if spanning:
+        print(f"Cost difference: {diff:.2f} ({100 * diff / exact_cost if exact_cost else 0:.2f}%)")
+    else:
+        print(f"Cost difference: N/A (sparse tree is missing {exact_tree - sparse_tree} connections)")
+    edges_used = "sparse" if sparse_can_span(grid, len(selected)) and spanning else "exact"
+    print(f"Dispatch uses {edges_used} edges: cost {dispatch_cost:.2f}, {dispatch_time:.4f} s")
+    return {"Exact Cost": exact_cost, "Sparse Cost": sparse_cost, "Cost Difference": diff,
+            "Dispatch Cost": dispatch_cost, "Exact Time": exact_time, "Sparse Time": sparse_time,
+            "Dispatch Time": dispatch_time, "Spanning": spanning}
+
+
+if __name__ == "__main__":
+    for keep in (4, 8, 16):
+        print(f"\nLightest-{keep} sparsification:")
+        grid = load_grid("random_power_graph_10000.npz", sparse_keep=keep)
+        # The usual dispatch, then one covering about a third of the grid
+        for target_power in (5000, 500000):
+            sparsification_report(grid, select_clean_priority, target_power, weight_uplift=0.02)
@@ -0,0 +1,260 @@
+import time
+import numpy as np
+from dispatch_pipeline import induce, load_grid, node_ids, station_name
+
+# Load the saved graph
+G = load_grid("random_power_graph_50.pkl")
+
+demand = 5000
+
+# mstStack adds 2% to every edge weight before building the MST
+weight_uplift = 0.02
+
+
+# Full mstStack selection order over available stations: source priority, then
+# (clean_score, -power_output, node) exactly as the per-source priority queues pop them.
+# Selection is always a prefix of this.
+def selection_order(grid):
+    positions = np.arange(len(grid["power"]))
+    order = np.lexsort((positions, -grid["power"], grid["clean"], grid["source"]))
+    order = order[grid["available"][order]]
+    return order, grid["power"][order]
+
+
+# Disjoint set find with path halving
+def find(parent, x):
+    while parent[x] != x:
+        parent[x] = parent[parent[x]]
+        x = parent[x]
+    return x
+
+
+# Kruskal over edges that are already sorted by weight; returns positions of the chosen edges
+def kruskal_sorted(node_count, eu, ev, candidates, active_count=None):
+    parent = list(range(node_count))
+    target = (node_count if active_count is None else active_count) - 1
+    chosen = []
+    for e in candidates:
+        ru, rv = find(parent, eu[e]), find(parent, ev[e])
+        if ru != rv:
+            parent[ru] = rv
+            chosen.append(e)
+            if len(chosen) == target:
+                break
+    return chosen
+
+
+# Root every tree of the MST forest: parent, depth, parent edge and Euler in/out times
+def root_forest(node_count, eu, ev, tree_edges):
+    adj = [[] for _ in range(node_count)]
+    for e in tree_edges:
+        adj[eu[e]].append((ev[e], e))
+        adj[ev[e]].append((eu[e], e))
+
+    parent = np.full(node_count, -1)
+    parent_edge = np.full(node_count, -1)
+    depth = np.zeros(node_count, dtype=int)
+    tin = np.zeros(node_count, dtype=int)
+    tout = np.zeros(node_count, dtype=int)
+    preorder = []
+    clock = 0
+    for root in range(node_count):
+        if parent[root] != -1:
+            continue
+        parent[root] = root
+        stack = [(root, iter(adj[root]))]
+        tin[root] = clock
+        clock += 1
+        preorder.append(root)
+        while stack:
+            x, it = stack[-1]
+            for y, e in it:
+                if parent[y] == -1:
+                    parent[y], parent_edge[y], depth[y] = x, e, depth[x] + 1
+                    tin[y] = clock
+                    clock += 1
+                    preorder.append(y)
+                    stack.append((y, iter(adj[y])))
+                    break
+            else:
+                tout[x] = clock
+                stack.pop()
+    return parent, parent_edge, depth, tin, tout, np.array(preorder, dtype=int)
+
+
+# Vectorized LCA for arrays of node pairs using binary lifting
+def lca_batch(parent, depth, a, b):
+    levels = max(1, int(depth.max()).bit_length())
+    up = [parent]
+    for _ in range(levels - 1):
+        up.append(up[-1][up[-1]])
+
+    a, b = a.copy(), b.copy()
+    swap = depth[a] < depth[b]
+    a[swap], b[swap] = b[swap], a[swap]
+    diff = depth[a] - depth[b]
+    for j in range(levels):
+        step = (diff >> j) & 1 == 1
+        a[step] = up[j][a[step]]
+    for j in reversed(range(levels)):
+        move = up[j][a] != up[j][b]
+        a[move] = up[j][a[move]]
+        b[move] = up[j][b[move]]
+    return np.where(a == b, a, parent[a])
+
+
+# Replacement edge for every tree edge in one sweep of the non-tree edges (lightest first).
+# Each tree edge is claimed by the first non-tree edge whose tree path covers it.
+def edge_replacements(node_count, eu, ev, non_tree, parent, parent_edge, depth):
+    replacement = {}
+    jump = list(range(node_count))  # jump[x] == x while the parent edge of x is uncovered
+    remaining = node_count - int(np.sum(parent == np.arange(node_count)))
+    for e in non_tree:
+        if remaining == 0:
+            break
+        a, b = find(jump, eu[e]), find(jump, ev[e])
+        while a != b:
+            if depth[a] < depth[b]:
+                a, b = b, a
+            replacement[parent_edge[a]] = e
+            remaining -= 1
+            jump[a] = parent[a]
+            a = find(jump, a)
+    return replacement
+
+
+# N-1 contingency table for the mstStack dispatch: every MST edge and every selected station
+def contingency_analysis(grid, demand):
+    start = time.time()
+    order, power = selection_order(grid)
+    prefix = np.cumsum(power)
+
+    k = int(np.searchsorted(prefix, demand)) + 1
+    if k > len(order):
+        print("Insufficient power available to meet demand.")
+        return None
+
+    # Every station outage refills from the same order, so one induced edge set covers them all
+    refill = np.searchsorted(prefix, demand + power[:k])
+    span = min(len(order), int(refill.max()) + 1)
+    ids = node_ids(grid, order[:span])
+    names = [station_name(grid, i) for i in order[:span]]
+
+    # Induced edges in positions along the order, sorted by weight once
+    eu, ev, ew = induce(grid, order[:span])
+    by_weight = np.argsort(ew, kind="stable")
+    eu, ev, ew = eu[by_weight], ev[by_weight], ew[by_weight] * (1.0 + weight_uplift)
+    top = np.maximum(eu, ev)
+
+    # Base MST over the selected prefix
+    in_selection = np.flatnonzero(top < k)
+    tree = kruskal_sorted(k, eu, ev, in_selection)
+    is_tree = np.zeros(len(eu), dtype=bool)
+    is_tree[tree] = True
+    base_cost = float(ew[tree].sum())
+
+    parent, parent_edge, depth, tin, tout, preorder = root_forest(k, eu, ev, tree)
+    non_tree = in_selection[~is_tree[in_selection]]
+
+    # Edge outages
+    replacement = edge_replacements(k, eu, ev, non_tree, parent, parent_edge, depth)
+    subtree_power = power[:k].astype(float)
+    for x in preorder[::-1]:
+        if parent[x] != x:
+            subtree_power[parent[x]] += subtree_power[x]
+    root_of = np.arange(k)
+    for x in preorder:
+        root_of[x] = root_of[parent[x]] if parent[x] != x else x
+
+    edge_rows = []
+    for x in range(k):
+        e = parent_edge[x]
+        if e < 0:
+            continue
+        r = replacement.get(e)
+        if r is not None:
+            new_cost, met = base_cost - ew[e] + ew[r], True
+            repl = (eu[r], ev[r])
+        else:
+            # No replacement: the tree splits into two islands; the larger one must carry demand
+            below = subtree_power[x]
+            above = subtree_power[root_of[x]] - below
+            new_cost, met, repl = base_cost - ew[e], max(below, above) >= demand, None
+        edge_rows.append({
+            "Edge": (eu[e], ev[e]),
+            "Weight": float(ew[e]),
+            "Replacement": repl,
+            "New Cost": float(new_cost),
+            "Demand Met": bool(met),
+        })
+
+    # Station outages: refill from the precomputed order, then re-span only candidate edges.
+    # MST(S - s + R) uses only surviving tree edges, non-tree edges whose tree cycle passes
+    # through s, and edges incident to the refill stations R.
+    nt_lca = lca_batch(parent, depth, eu[non_tree], ev[non_tree])
+    nt_u, nt_v = eu[non_tree], ev[non_tree]
+    station_rows = []
+    for i in range(k):
+        j = int(refill[i]) + 1
+        met = j <= len(order)
+        j = min(j, span)
+        touches = (eu == i) | (ev == i)
+
+        through = ((tin[i] <= tin[nt_u]) & (tin[nt_u] < tout[i])) | ((tin[i] <= tin[nt_v]) & (tin[nt_v] < tout[i]))
+        through &= (tin[nt_lca] <= tin[i]) & (tin[i] < tout[nt_lca])
+        candidate = is_tree.copy()
+        candidate[non_tree[through]] = True
+        candidate |= (top >= k) & (top < j)
+        candidate &= ~touches & (top < j)
+
+        chosen = kruskal_sorted(span, eu, ev, np.flatnonzero(candidate), j - 1)
+        station_rows.append({
+            "Station": i,
+            "Power": int(power[i]),
+            "Replacements": list(range(k, j)),
+            "New Cost": float(ew[chosen].sum()),
+            "Connected": len(chosen) == j - 2,
+            "Demand Met": bool(met),
+        })
+
+    elapsed = time.time() - start
+    print(f"\nBase MST Cost: {base_cost:.2f} over {k} stations")
+
+    print("\nEdge Outages:")
+    for row in edge_rows:
+        u, v = row["Edge"]
+        if row["Replacement"]:
+            a, b = row["Replacement"]
+            repl = f"{names[a]} - {names[b]}"
+        else:
+            repl = "none (islanded)"
+        print(f"{names[u]} - {names[v]} ({row['Weight']:.2f}) -> {repl}, "
+              f"new cost {row['New Cost']:.2f}, demand met: {row['Demand Met']}")
+
+    print("\nStation Outages:")
+    for row in station_rows:
+        added = ", ".join(names[n] for n in row["Replacements"]) or "none"
+        print(f"{names[row['Station']]} ({row['Power']}) -> add [{added}], "
+              f"new cost {row['New Cost']:.2f}, connected: {row['Connected']}, demand met: {row['Demand Met']}")
+
+    # Rows report original node ids
+    for row in edge_rows:
+        row["Edge"] = (ids[row["Edge"][0]], ids[row["Edge"][1]])
+        if row["Replacement"]:
+            row["Replacement"] = (ids[row["Replacement"][0]], ids[row["Replacement"][1]])
+    for row in station_rows:
+        row["Station"] = ids[row["Station"]]
+        row["Replacements"] = [ids[n] for n in row["Replacements"]]
+
+    print(f"\nN-1 table: {len(edge_rows)} edge and {len(station_rows)} station contingencies in {elapsed:.3f} seconds")
+
+    return {
+        "Base Cost": base_cost,
+        "Selected Nodes": ids[:k],
+        "Edge Outages": edge_rows,
+        "Station Outages": station_rows,
+    }
+
+
+# Run the analysis
+contingency_analysis(G, demand)
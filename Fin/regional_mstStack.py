@@ -0,0 +1,197 @@
+import os
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from boruvka_mst import boruvka_mst
+from dispatch_pipeline import load_grid, node_ids, priority_sources
+
+demand = 5000
+region_count = 8
+
+# mstStack adds 2% to every edge weight before building the MST
+weight_uplift = 0.02
+
+
+# Adjacency of the edge arrays in CSR form (both directions)
+def build_csr(node_count, u, v):
+    src = np.concatenate([u, v])
+    dst = np.concatenate([v, u])
+    order = np.argsort(src, kind="stable")
+    indptr = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=node_count), out=indptr[1:])
+    return indptr, dst[order]
+
+
+# Region label per node: the grid's region column when present, otherwise regions are
+# grown from random seeds by a multi-source BFS over the CSR arrays (one vectorized step per level).
+# No region grows past ceil(node_count / region_count): a node reached by several regions goes
+# to the smallest, and a region only takes as many new nodes per level as it has room for.
+def partition_regions(grid, region_count, seed=0):
+    if "region" in grid:
+        return np.unique(grid["region"], return_inverse=True)[1].reshape(-1)
+
+    u, v = grid["u"], grid["v"]
+    node_count = len(grid["power"])
+    region_count = min(region_count, node_count)
+    cap = -(-node_count // region_count)
+    indptr, indices = build_csr(node_count, u, v)
+    labels = np.full(node_count, -1)
+    rng = np.random.default_rng(seed)
+    frontier = rng.choice(node_count, size=region_count, replace=False)
+    labels[frontier] = np.arange(region_count)
+    sizes = np.ones(region_count, dtype=np.int64)
+    while len(frontier):
+        degree = indptr[frontier + 1] - indptr[frontier]
+        offsets = np.repeat(indptr[frontier] - np.cumsum(degree) + degree, degree) + np.arange(degree.sum())
+        neighbours = indices[offsets]
+        owners = np.repeat(labels[frontier], degree)
+        fresh = labels[neighbours] == -1
+        neighbours, owners = neighbours[fresh], owners[fresh]
+
+        # Contested nodes go to the smallest region reaching them
+        order = np.lexsort((sizes[owners], neighbours))
+        neighbours, first = np.unique(neighbours[order], return_index=True)
+        owners = owners[order][first]
+
+        # Each region accepts new nodes only up to its room; the rest stay open for other regions
+        by_owner = np.argsort(owners, kind="stable")
+        counts = np.bincount(owners, minlength=region_count)
+        rank = np.arange(len(by_owner)) - np.repeat(np.cumsum(counts) - counts, counts)
+        accepted = by_owner[rank < (cap - sizes)[owners[by_owner]]]
+        frontier = neighbours[accepted]
+        labels[frontier] = owners[accepted]
+        sizes += np.bincount(owners[accepted], minlength=region_count)
+
+    # Nodes with no path to a region with room fill the smallest regions first
+    unreached = np.flatnonzero(labels == -1)
+    room = np.repeat(np.arange(region_count), cap - sizes)
+    fill = np.argsort(np.concatenate([np.arange(s, cap) for s in sizes]), kind="stable")
+    labels[unreached] = room[fill[:len(unreached)]]
+    return labels
+
+
+# Every region rounds its share up by one station, so the union overshoots by up to one station
+# per region. While demand stays met, drop the region-final pick that global mstStack would take
+# last (dirtiest source, then lowest output). The selection can still differ from global mstStack,
+# which takes stations in priority order across all regions rather than per region.
+def trim_overshoot(picks, power, clean, source, demand):
+    picks = list(picks)
+    total = sum(int(power[p].sum()) for p in picks)
+    while True:
+        last = [(int(source[p[-1]]), int(clean[p[-1]]), -int(power[p[-1]]), int(p[-1]), r)
+                for r, p in enumerate(picks) if len(p) and total - power[p[-1]] >= demand]
+        if not last:
+            return picks
+        r = max(last)[-1]
+        total -= int(power[picks[r][-1]])
+        picks[r] = picks[r][:-1]
+
+
+# mstStack selection and MST for one region; runs in a worker process and only ever sees that
+# region's available stations and the edges between them. Stations are taken in priority order
+# until the region's share of demand is met, or exactly `count` of them when the parent has
+# trimmed the region's selection. Picks come back in priority order.
+def dispatch_region(region):
+    ids, power, clean, source, share, eu, ev, ew, count = region
+    order = np.lexsort((ids, -power, clean, source))
+    if count is None:
+        count = np.searchsorted(np.cumsum(power[order]), share) + 1
+    chosen = order[:min(count, len(order))]
+
+    local = np.full(len(ids), -1)
+    local[chosen] = np.arange(len(chosen))
+    inside = (local[eu] >= 0) & (local[ev] >= 0)
+    su, sv, sw = eu[inside], ev[inside], ew[inside] * (1.0 + weight_uplift)
+    tree = boruvka_mst(len(chosen), local[su], local[sv], sw)
+    return ids[chosen], ids[su[tree]], ids[sv[tree]], sw[tree]
+
+
+# Region-partitioned mstStack: per-region selection and MST run concurrently, the overshoot is
+# trimmed, regions that lost stations get their tree rebuilt, then the regional trees are
+# stitched together over the boundary edges between selected stations
+def run_regional_selection(grid, demand, region_count, workers=None):
+    start = time.time()
+    u, v, w = grid["u"], grid["v"], grid["w"]
+    node_count = len(grid["power"])
+    available = grid["available"]
+    power = np.where(available, grid["power"], 0)
+    clean, source = grid["clean"], grid["source"]
+
+    if power.sum() < demand:
+        print("Insufficient power available to meet demand.")
+        return None
+
+    labels = partition_regions(grid, region_count)
+    regions = np.unique(labels)
+
+    # Each region carries the share of demand matching its share of available power, and only
+    # the edges between its available stations
+    internal = labels[u] == labels[v]
+    regional = []
+    for r in regions:
+        ids = np.flatnonzero((labels == r) & available)
+        local = np.full(node_count, -1)
+        local[ids] = np.arange(len(ids))
+        mask = internal & (labels[u] == r) & available[u] & available[v]
+        share = demand * power[ids].sum() / power.sum()
+        regional.append((ids, power[ids], clean[ids], source[ids], share,
+                         local[u[mask]], local[v[mask]], w[mask], None))
+
+    with ProcessPoolExecutor(max_workers=workers or min(len(regions), os.cpu_count())) as pool:
+        results = list(pool.map(dispatch_region, regional))
+
+        picks = trim_overshoot([r[0] for r in results], power, clean, source, demand)
+        trimmed = [i for i, (p, r) in enumerate(zip(picks, results)) if len(p) < len(r[0])]
+        redo = [regional[i][:-1] + (len(picks[i]),) for i in trimmed]
+        for i, result in zip(trimmed, pool.map(dispatch_region, redo)):
+            results[i] = result
+
+    selected = np.concatenate([r[0] for r in results])
+    tree_u = np.concatenate([r[1] for r in results])
+    tree_v = np.concatenate([r[2] for r in results])
+    tree_w = np.concatenate([r[3] for r in results])
+    is_selected = np.zeros(node_count, dtype=bool)
+    is_selected[selected] = True
+
+    # Stitch: an MST over the regional tree edges plus the boundary edges between selected
+    # stations. Intra-region edges outside a regional tree can never enter the global tree
+    # (cycle property), so this equals the MST of the whole selection.
+    boundary = ~internal & is_selected[u] & is_selected[v]
+    local = np.full(node_count, -1)
+    local[selected] = np.arange(len(selected))
+    su = np.concatenate([tree_u, u[boundary]])
+    sv = np.concatenate([tree_v, v[boundary]])
+    sw = np.concatenate([tree_w, w[boundary] * (1.0 + weight_uplift)])
+    stitched = boruvka_mst(len(selected), local[su], local[sv], sw)
+    crossing = int(np.sum(stitched >= len(tree_w)))
+
+    total_power = int(power[selected].sum())
+    stitched_cost = float(sw[stitched].sum())
+    breakdown = dict(zip(priority_sources, np.bincount(source[selected], minlength=len(priority_sources)).tolist()))
+    elapsed = time.time() - start
+
+    print(f"\nRegions: {len(regions)}, sizes {np.bincount(labels).tolist()}")
+    print(f"Total Selected Power: {total_power}")
+    print(f"Energy Breakdown: {breakdown}")
+    print(f"Regional tree edges: {len(tree_w)}, boundary edges used: {crossing} of {int(boundary.sum())}")
+    print(f"\nTotal MST Cost: {stitched_cost:.2f}")
+    print(f"Elapsed: {elapsed:.3f} seconds")
+
+    nodes = node_ids(grid, np.arange(node_count))
+    mst_edges = zip(su[stitched].tolist(), sv[stitched].tolist(), sw[stitched].tolist())
+    return {
+        "Selected Nodes": node_ids(grid, selected),
+        "Total Power": total_power,
+        "Total Cost": stitched_cost,
+        "Energy Breakdown": breakdown,
+        "MST Edges": [(nodes[a], nodes[b], c) for a, b, c in mst_edges],
+        "Regions": dict(zip(nodes, labels.tolist())),
+    }
+
+
+if __name__ == "__main__":
+    # Load the saved graph
+    G = load_grid("random_power_graph_10000.npz")
+
+    run_regional_selection(G, demand, region_count)
@@ -0,0 +1,154 @@
+import os
+import pickle
+import numpy as np
+
+# One fixed-size record per station update, appended to the log as raw bytes
+record_dtype = np.dtype([
+    ("station", "<i8"),
+    ("timestamp", "<f8"),
+    ("power_output", "<i4"),
+    ("status", "u1"),
+])
+
+# Field values meaning "leave as is", so a record can update only output or only status
+KEEP_POWER = -1
+KEEP_STATUS = 255
+OFFLINE = 0
+ONLINE = 1
+
+
+# Append one batch of updates with a single write; the log is never rewritten in place
+def append_updates(log_path, stations, timestamps, power_outputs=None, status=None):
+    batch = np.empty(len(stations), dtype=record_dtype)
+    batch["station"] = stations
+    batch["timestamp"] = timestamps
+    batch["power_output"] = KEEP_POWER if power_outputs is None else power_outputs
+    batch["status"] = KEEP_STATUS if status is None else status
+    with open(log_path, "ab") as f:
+        batch.tofile(f)
+    return len(batch)
+
+
+# Records appended since the grid last read the log
+def read_new_records(grid, log_path):
+    offset = grid.get("log_offset", 0)
+    if not os.path.exists(log_path) or os.path.getsize(log_path) <= offset:
+        return np.empty(0, dtype=record_dtype)
+    records = np.fromfile(log_path, dtype=record_dtype, offset=offset)
+    grid["log_offset"] = offset + records.nbytes
+    return records
+
+
+# Index of the newest valid record per station (ties go to the record appended last)
+def latest_per_station(stations, timestamps, valid):
+    rows = np.flatnonzero(valid)
+    if not len(rows):
+        return rows
+    order = rows[np.lexsort((timestamps[rows], stations[rows]))]
+    return order[np.r_[stations[order][1:] != stations[order][:-1], True]]
+
+
+# Latest value per station for one field. Each field keeps its own update time per station, so
+# records older than what the grid already holds are dropped even when they arrive late.
+def _apply_field(grid, column, positions, timestamps, values, valid):
+    stamp = grid.setdefault(column + "_updated_at", np.full(len(grid["power"]), -np.inf))
+    last = latest_per_station(positions, timestamps, valid)
+    fresh = last[timestamps[last] >= stamp[positions[last]]]
+    stamp[positions[fresh]] = timestamps[fresh]
+    return positions[fresh], values[fresh]
+
+
+# Apply new log records to the in-memory grid columns: O(new records), no reserialization.
+# Records for stations not in the grid are ignored. Returns the number of records read.
+def apply_log(grid, log_path=None):
+    log_path = log_path or grid["telemetry"]
+    records = read_new_records(grid, log_path)
+    if not len(records):
+        return 0
+
+    node_ids = np.asarray(grid["nodes"])
+    sorter = np.argsort(node_ids, kind="stable")
+    slot = np.minimum(np.searchsorted(node_ids, records["station"], sorter=sorter), len(node_ids) - 1)
+    positions = sorter[slot]
+    known = node_ids[positions] == records["station"]
+
+    changed, power = _apply_field(grid, "power", positions, records["timestamp"], records["power_output"],
+                                  known & (records["power_output"] != KEEP_POWER))
+    grid["power"][changed] = power
+    changed, status = _apply_field(grid, "available", positions, records["timestamp"], records["status"],
+                                   known & (records["status"] != KEEP_STATUS))
+    grid["available"][changed] = status == ONLINE
+    return len(records)
+
+
+# Fold the log into the base file and start a fresh log. The log is rotated first, so
+# writers appending during compaction land in the new log instead of being lost, and a live
+# grid catches up on exactly the rotated records before its offset moves to the new log.
+# The base is rewritten in its own format (.npz grid or pickled graph) through a temporary
+# file, so later compactions and every loader build on the folded state.
+def compact(base_file, log_path, grid=None):
+    from dispatch_pipeline import grid_from_graph, load_grid, node_ids, save_grid
+
+    if not os.path.exists(log_path):
+        return 0
+    folding = log_path + ".compacting"
+    os.replace(log_path, folding)
+    if grid is not None:
+        apply_log(grid, folding)
+        grid["log_offset"] = 0
+
+    if base_file.endswith(".npz"):
+        base = load_grid(base_file)
+        folded = apply_log(base, folding)
+        save_grid(base, base_file)
+    else:
+        # Pickled graph: fold through its grid columns, then write output and status back
+        # onto the graph so its other attributes are kept
+        with open(base_file, "rb") as f:
+            graph = pickle.load(f)
+        base = grid_from_graph(graph)
+        folded = apply_log(base, folding)
+        nodes = node_ids(base, np.arange(len(base["power"])))
+        for node, power, available in zip(nodes, base["power"].tolist(), base["available"].tolist()):
+            graph.nodes[node]["power_output"] = power
+            graph.nodes[node]["available"] = available
+        with open(base_file + ".tmp", "wb") as f:
+            pickle.dump(graph, f)
+        os.replace(base_file + ".tmp", base_file)
+    os.remove(folding)
+    print(f"Compacted {folded} updates into '{base_file}'.")
+    return folded
+
+
+if __name__ == "__main__":
+    import time
+    from dispatch_pipeline import load_grid, run_dispatch, select_clean_priority
+
+    base_file = "random_power_graph_10000.npz"
+    log_path = "random_power_graph_10000.telemetry"
+
+    grid = load_grid(base_file)
+    grid["telemetry"] = log_path
+    node_ids = np.asarray(grid["nodes"])
+    rng = np.random.default_rng(0)
+
+    # Simulated feed: 1M output updates and 100k status flips in batches of 10k
+    start = time.time()
+    written = 0
+    for batch in range(100):
+        stations = rng.choice(node_ids, 10000)
+        now = time.time()
+        written += append_updates(log_path, stations, np.full(10000, now), rng.integers(10, 251, 10000))
+        if batch % 10 == 0:
+            flips = rng.choice(node_ids, 10000)
+            written += append_updates(log_path, flips, np.full(10000, now), status=rng.integers(0, 2, 10000))
+    print(f"Ingested {written} updates in {time.time() - start:.3f} seconds")
+
+    start = time.time()
+    applied = apply_log(grid)
+    print(f"Applied {applied} updates to the grid in {time.time() - start:.3f} seconds")
+    run_dispatch(grid, select_clean_priority, 5000, show_edges=False, accounting="mstStack")
+
+    start = time.time()
+    compact(base_file, log_path, grid)
+    print(f"Compaction took {time.time() - start:.3f} seconds")
@@ -0,0 +1,51 @@
+import os
+import sys
+import numpy as np
+import networkx as nx
+import pulp
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Fin"))
+from dispatch_pipeline import grid_from_graph, node_ids, select_lp
+
+
+# Random power graph with the generator's attributes; the grid keeps uint8 edge weights as
+# the generator writes them
+def sample_grid(node_count=50, edge_prob=0.1, seed=5):
+    rng = np.random.default_rng(seed)
+    sources = ["Solar", "Wind", "Hydro", "Coal"]
+    graph = nx.gnp_random_graph(node_count, edge_prob, seed=seed)
+    for n in graph.nodes:
+        source = sources[rng.integers(4)]
+        graph.nodes[n].update(name=f"N{n}", energy_source=source, clean_score=sources.index(source),
+                              power_output=int(rng.integers(10, 251)))
+    for a, b in graph.edges:
+        graph.edges[a, b]["weight"] = int(rng.integers(0, 101))
+    grid = grid_from_graph(graph)
+    grid["w"] = grid["w"].astype(np.uint8)
+    return graph, grid
+
+
+# The LP as line_prog.py built it on the networkx graph before the grid columns existed
+def baseline_lp(graph, target_power, alpha, beta, gamma):
+    prob = pulp.LpProblem("CleanPowerSelection", pulp.LpMinimize)
+    node_vars = {i: pulp.LpVariable(f"x_{i}", cat='Binary') for i in graph.nodes()}
+    prob += pulp.lpSum(node_vars[i] * (alpha * graph.nodes[i]['clean_score'] + beta +
+                                       gamma * sum(d['weight'] for _, _, d in graph.edges(i, data=True)))
+                       for i in graph.nodes())
+    prob += pulp.lpSum(node_vars[i] * graph.nodes[i]['power_output'] for i in graph.nodes()) >= target_power
+    prob.solve(pulp.PULP_CBC_CMD(msg=0))
+    return pulp.value(prob.objective)
+
+
+def objective(graph, nodes, alpha, beta, gamma):
+    return sum(alpha * graph.nodes[i]['clean_score'] + beta +
+               gamma * sum(d['weight'] for _, _, d in graph.edges(i, data=True)) for i in nodes)
+
+
+def test_strong_clean_preference_matches_networkx_baseline():
+    graph, grid = sample_grid()
+    for alpha in (100, 1000):
+        selected, _ = select_lp(grid, 5000, alpha=alpha, beta=1, gamma=0.01)
+        nodes = node_ids(grid, selected)
+        assert sum(graph.nodes[n]['power_output'] for n in nodes) >= 5000
+        assert np.isclose(objective(graph, nodes, alpha, 1, 0.01), baseline_lp(graph, 5000, alpha, 1, 0.01))
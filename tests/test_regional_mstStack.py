@@ -0,0 +1,67 @@
+import os
+import sys
+import numpy as np
+import networkx as nx
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Fin"))
+from dispatch_pipeline import grid_from_graph
+from regional_mstStack import partition_regions, run_regional_selection, weight_uplift
+
+
+# Random power graph with the generator's attributes and every third station offline
+def offline_grid(node_count=300, edge_prob=0.05, seed=3):
+    rng = np.random.default_rng(seed)
+    sources = ["Solar", "Wind", "Hydro", "Coal"]
+    graph = nx.gnp_random_graph(node_count, edge_prob, seed=seed)
+    for n in graph.nodes:
+        source = sources[rng.integers(4)]
+        graph.nodes[n].update(name=f"N{n}", energy_source=source, clean_score=sources.index(source),
+                              power_output=int(rng.integers(10, 251)), available=n % 3 != 0)
+    for a, b in graph.edges:
+        graph.edges[a, b]["weight"] = int(rng.integers(0, 101))
+    return graph, grid_from_graph(graph)
+
+
+def test_offline_stations_are_never_selected_or_linked():
+    graph, grid = offline_grid()
+    result = run_regional_selection(grid, 5000, 4, workers=2)
+
+    selected = result["Selected Nodes"]
+    assert all(graph.nodes[n]["available"] for n in selected)
+    for a, b, c in result["MST Edges"]:
+        assert graph.has_edge(a, b)
+        assert np.isclose(c, graph.edges[a, b]["weight"] * (1 + weight_uplift))
+
+    reference = nx.minimum_spanning_tree(graph.subgraph(selected), weight="weight")
+    expected = sum(d["weight"] for _, _, d in reference.edges(data=True)) * (1 + weight_uplift)
+    assert np.isclose(result["Total Cost"], expected)
+
+
+def test_region_with_no_available_stations():
+    graph, grid = offline_grid()
+    grid["region"] = np.arange(len(grid["power"]), dtype=np.int32) % 3  # region 0 is all offline
+    result = run_regional_selection(grid, 5000, 3, workers=2)
+
+    assert result["Total Power"] >= 5000
+    assert all(graph.nodes[n]["available"] for n in result["Selected Nodes"])
+
+
+def test_overshoot_is_trimmed_below_one_station():
+    graph, grid = offline_grid()
+    result = run_regional_selection(grid, 5000, 8, workers=2)
+
+    largest = max(d["power_output"] for _, d in graph.nodes(data=True))
+    assert 5000 <= result["Total Power"] < 5000 + largest
+
+    # Trimmed regions get their tree rebuilt, so the stitched tree is still the exact MST
+    reference = nx.minimum_spanning_tree(graph.subgraph(result["Selected Nodes"]), weight="weight")
+    expected = sum(d["weight"] for _, _, d in reference.edges(data=True)) * (1 + weight_uplift)
+    assert np.isclose(result["Total Cost"], expected)
+
+
+def test_bfs_regions_stay_within_cap():
+    for edge_prob in (0.1, 0.002):
+        _, grid = offline_grid(node_count=1001, edge_prob=edge_prob)
+        sizes = np.bincount(partition_regions(grid, 8), minlength=8)
+        assert sizes.sum() == 1001
+        assert sizes.max() <= 126 and sizes.min() > 0
@@ -0,0 +1,59 @@
+import os
+import pickle
+import sys
+import numpy as np
+import networkx as nx
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Fin"))
+from dispatch_pipeline import grid_from_graph, load_grid, save_grid
+from telemetry_log import OFFLINE, append_updates, apply_log, compact
+
+
+def sample_graph(node_count=20, seed=7):
+    rng = np.random.default_rng(seed)
+    graph = nx.gnp_random_graph(node_count, 0.3, seed=seed)
+    for n in graph.nodes:
+        graph.nodes[n].update(name=f"N{n}", energy_source="Solar", clean_score=0,
+                              power_output=int(rng.integers(10, 251)), region=f"R{n % 2}")
+    for a, b in graph.edges:
+        graph.edges[a, b]["weight"] = int(rng.integers(0, 101))
+    return graph
+
+
+@pytest.mark.parametrize("base_name", ["base.pkl", "base.npz"])
+def test_consecutive_compactions_keep_earlier_updates(tmp_path, base_name):
+    graph = sample_graph()
+    base_file, log_path = str(tmp_path / base_name), str(tmp_path / "base.telemetry")
+    if base_name.endswith(".pkl"):
+        with open(base_file, "wb") as f:
+            pickle.dump(graph, f)
+    else:
+        save_grid(grid_from_graph(graph), base_file)
+
+    live = load_grid(base_file)
+    append_updates(log_path, [1, 2], [1.0, 1.0], [999, 500])
+    assert compact(base_file, log_path, live) == 2
+    append_updates(log_path, [2, 3], [2.0, 2.0], [600, 700])
+    append_updates(log_path, [4], [2.0], status=[OFFLINE])
+    assert compact(base_file, log_path, live) == 3
+
+    base = load_grid(base_file)
+    for grid in (base, live):
+        power = dict(zip(grid["nodes"].tolist(), grid["power"].tolist()))
+        assert (power[1], power[2], power[3]) == (999, 600, 700)
+        assert not grid["available"][grid["nodes"] == 4].any()
+    assert not os.path.exists(log_path + ".compacting")
+
+    if base_name.endswith(".pkl"):
+        with open(base_file, "rb") as f:
+            folded = pickle.load(f)
+        assert folded.nodes[1]["region"] == "R1"  # attributes outside the grid columns are kept
+
+
+def test_power_only_batch_applies(tmp_path):
+    grid = grid_from_graph(sample_graph())
+    log_path = str(tmp_path / "power.telemetry")
+    append_updates(log_path, [1, 2, 3], [1.0, 1.0, 1.0], [100, 100, 100])
+    assert apply_log(grid, log_path) == 3
+    assert grid["power"][np.isin(grid["nodes"], [1, 2, 3])].tolist() == [100, 100, 100]